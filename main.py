@@ -1,19 +1,16 @@
 import sys
 import argparse
+import asyncio
 from pathlib import Path
 from datetime import datetime
 import subprocess
 import time
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import OperationalError
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 
 sys.path.append(str(Path(__file__).parent / "src"))
 
-from src.extract import DataExtractor
-from src.transform import DataTransformer
-from src.load import DatabaseLoader
-from src.analytics import DataAnalytics
-from src.logger_config import setup_logging
+from logger_config import setup_logging
 
 logger = setup_logging(log_file=Path(__file__).parent / "logs" / "pipeline.log")
 
@@ -26,18 +23,52 @@ class DataPipeline:
         api_url: str = "https://jsonplaceholder.typicode.com",
         db_conn_str: str = "sqlite:///local.db",
         data_dir: str = "data",
+        analytics_source: str = "db",
+        report_format: str = "feather",
+        write_feather: bool = False,
     ):
         self.api_url = api_url
         self.db_conn_str = db_conn_str
         self.data_dir = data_dir
-
-        self.extractor = DataExtractor(api_url, data_dir)
-        self.transformer = DataTransformer(data_dir)
-        self.loader = DatabaseLoader(db_conn_str, data_dir)
-        self.analytics = DataAnalytics(db_conn_str)
+        self.analytics_source = analytics_source
+        self.report_format = report_format
+        self.write_feather = write_feather
+        self._cached_tables = None
 
         logger.info(f"Pipeline initialized: API={api_url}, DB={db_conn_str}")
 
+    # Stage components are imported and created on first use, so a single
+    # stage run does not pay for importing the other stages' dependencies
+
+    @cached_property
+    def extractor(self):
+        from src.extract import DataExtractor
+
+        return DataExtractor(self.api_url, self.data_dir)
+
+    @cached_property
+    def transformer(self):
+        from src.transform import DataTransformer
+
+        return DataTransformer(self.data_dir)
+
+    @cached_property
+    def loader(self):
+        from src.load import DatabaseLoader
+
+        return DatabaseLoader(self.db_conn_str, self.data_dir)
+
+    @cached_property
+    def analytics(self):
+        from src.analytics import DataAnalytics
+
+        return DataAnalytics(
+            self.db_conn_str,
+            source=self.analytics_source,
+            data_dir=self.data_dir,
+            report_format=self.report_format,
+        )
+
     def run_extract(self) -> dict:
         """Extract data stage"""
 
@@ -46,8 +77,10 @@ class DataPipeline:
         results = {}
 
         try:
-            users_data = self.extractor.extract_and_save(
-                "/users", filename="users.json"
+            users_data, posts_data = asyncio.run(
+                self.extractor.extract_all(
+                    [("/users", "users.json"), ("/posts", "posts.json")]
+                )
             )
             results["users"] = {
                 "success": True,
@@ -55,9 +88,6 @@ class DataPipeline:
                 "data": users_data,
             }
 
-            posts_data = self.extractor.extract_and_save(
-                "/posts", filename="posts.json"
-            )
             results["posts"] = {
                 "success": True,
                 "count": len(posts_data),
@@ -83,24 +113,43 @@ class DataPipeline:
         results = {}
 
         try:
-            users_df = self.transformer.process_data(
-                "users.json", "users.parquet", "users"
-            )
+            # Users and posts are transformed concurrently,
+            # stamped with one timestamp for this run
+            created_at = datetime.now().isoformat()
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                users_future = executor.submit(
+                    self.transformer.process_data,
+                    "users.json",
+                    "users.parquet",
+                    "users",
+                    created_at,
+                    self.write_feather,
+                )
+                posts_future = executor.submit(
+                    self.transformer.process_data,
+                    "posts.json",
+                    "posts.parquet",
+                    "posts",
+                    created_at,
+                    self.write_feather,
+                )
+            users_df, users_table = users_future.result()
+            posts_df, posts_table = posts_future.result()
+
             results["users"] = {
                 "success": True,
                 "count": len(users_df),
                 "columns": users_df.columns.tolist(),
             }
-
-            posts_df = self.transformer.process_data(
-                "posts.json", "posts.parquet", "posts"
-            )
             results["posts"] = {
                 "success": True,
                 "count": len(posts_df),
                 "columns": posts_df.columns.tolist(),
             }
 
+            # Kept in memory so a following load stage can skip the parquet round trip
+            self._cached_tables = {"users": users_table, "posts": posts_table}
+
             logger.info(
                 f"Transformation completed: {len(users_df)} users, {len(posts_df)} posts"
             )
@@ -118,7 +167,7 @@ class DataPipeline:
         logger.info("=== STAGE 3: LOAD TO DATABASE ===")
 
         try:
-            results = self.loader.load_all_data()
+            results = self.loader.load_all_data(tables=self._cached_tables)
 
             total_records = sum(
                 r.get("count", 0) for r in results.values() if "error" not in r
@@ -141,7 +190,10 @@ class DataPipeline:
 
             logger.info("Analytics completed:")
             logger.info(f"  - JSON report: {results['json_report']}")
-            logger.info(f"  - CSV files: {results['total_csv_files']} files generated")
+            logger.info(
+                f"  - {results['report_format'].upper()} files: "
+                f"{results['total_report_files']} files generated"
+            )
             logger.info(
                 f"  - Queries executed: {', '.join(results['queries_executed'])}"
             )
@@ -152,8 +204,98 @@ class DataPipeline:
             logger.error(f"Error during analytics: {e}")
             raise
 
-    def run_full_pipeline(self) -> dict:
-        """Run the entire pipeline"""
+        finally:
+            # Connections are reopened lazily if analytics runs again
+            self.analytics.close()
+
+    async def _run_fused_stages(self) -> dict:
+        """
+        Extract, transform and load in memory.
+        Raw JSON and processed parquet files are written by background
+        threads and are awaited before returning, but no stage reads them.
+        """
+
+        logger.info("=== FUSED STAGES: EXTRACT -> TRANSFORM -> LOAD ===")
+
+        stages = {}
+        background_writes = []
+
+        # Background writes are always awaited, even when a later stage
+        # fails, so files are not lost to cancellation at loop shutdown
+        try:
+            users_data, posts_data = await self.extractor.fetch_all(
+                ["/users", "/posts"]
+            )
+            for data, filename in (
+                (users_data, "users.json"),
+                (posts_data, "posts.json"),
+            ):
+                background_writes.append(
+                    asyncio.create_task(
+                        asyncio.to_thread(self.extractor.save_raw_data, data, filename)
+                    )
+                )
+            stages["extract"] = {
+                "users": {"success": True, "count": len(users_data)},
+                "posts": {"success": True, "count": len(posts_data)},
+            }
+
+            created_at = datetime.now().isoformat()
+            users_df = self.transformer.transform_users_data(users_data, created_at)
+            posts_df = self.transformer.transform_posts_data(posts_data, created_at)
+            tables = {
+                "users": self.transformer.to_arrow_table(users_df, "users"),
+                "posts": self.transformer.to_arrow_table(posts_df, "posts"),
+            }
+            for table_name, table in tables.items():
+                background_writes.append(
+                    asyncio.create_task(
+                        asyncio.to_thread(
+                            self.transformer.write_parquet,
+                            table,
+                            f"{table_name}.parquet",
+                        )
+                    )
+                )
+                if self.write_feather:
+                    background_writes.append(
+                        asyncio.create_task(
+                            asyncio.to_thread(
+                                self.transformer.write_feather,
+                                table,
+                                f"{table_name}.feather",
+                            )
+                        )
+                    )
+            stages["transform"] = {
+                name: {
+                    "success": True,
+                    "count": len(df),
+                    "columns": df.columns.tolist(),
+                }
+                for name, df in (("users", users_df), ("posts", posts_df))
+            }
+
+            stages["load"] = await asyncio.to_thread(
+                self.loader.load_all_data, tables=tables
+            )
+
+        finally:
+            results = await asyncio.gather(*background_writes, return_exceptions=True)
+            write_errors = [r for r in results if isinstance(r, BaseException)]
+            for error in write_errors:
+                logger.error(f"Background file write failed: {error}")
+
+        if write_errors:
+            raise write_errors[0]
+        return stages
+
+    def run_full_pipeline(self, fused: bool = False) -> dict:
+        """
+        Run the entire pipeline.
+        With fused=True, extract/transform/load pass data in memory
+        instead of through the intermediate files.
+        """
 
         logger.info("STARTING FULL DATA PIPELINE")
         start_time = datetime.now()
@@ -161,14 +303,18 @@ class DataPipeline:
         pipeline_results = {"start_time": start_time.isoformat(), "stages": {}}
 
         try:
-            # Stage 1: Extract
-            pipeline_results["stages"]["extract"] = self.run_extract()
+            if fused:
+                # Stages 1-3 without the file round trips
+                pipeline_results["stages"].update(asyncio.run(self._run_fused_stages()))
+            else:
+                # Stage 1: Extract
+                pipeline_results["stages"]["extract"] = self.run_extract()
 
-            # Stage 2: Transform
-            pipeline_results["stages"]["transform"] = self.run_transform()
+                # Stage 2: Transform
+                pipeline_results["stages"]["transform"] = self.run_transform()
 
-            # Stage 3: Load
-            pipeline_results["stages"]["load"] = self.run_load()
+                # Stage 3: Load
+                pipeline_results["stages"]["load"] = self.run_load()
 
             # Stage 4: Analytics
             pipeline_results["stages"]["analytics"] = self.run_analytics()
@@ -199,6 +345,11 @@ class DataPipeline:
 
         return pipeline_results
 
+    def run_full_pipeline_fused(self) -> dict:
+        """Run the entire pipeline with in-memory extract/transform/load"""
+
+        return self.run_full_pipeline(fused=True)
+
     def run_single_stage(self, stage: str) -> dict:
         """Run a single pipeline stage"""
         stages = {
@@ -223,9 +374,9 @@ def main():
     parser = argparse.ArgumentParser(description="Data Pipeline")
     parser.add_argument(
         "--stage",
-        choices=["extract", "transform", "load", "analytics", "full"],
+        choices=["extract", "transform", "load", "analytics", "full", "fused"],
         default="full",
-        help="Stage to run",
+        help="Stage to run ('fused' runs the full pipeline in memory)",
     )
     parser.add_argument(
         "--api-url",
@@ -243,10 +394,31 @@ def main():
         help="Use Docker Compose to run PostgreSQL instead of SQLite",
     )
     parser.add_argument("--data-dir", default="data", help="Directory for storing data")
+    parser.add_argument(
+        "--analytics-source",
+        choices=["db", "parquet"],
+        default="db",
+        help="Run analytics against the database or, with DuckDB, "
+        "directly against today's processed parquet files",
+    )
+    parser.add_argument(
+        "--report-format",
+        choices=["feather", "parquet", "csv"],
+        default="feather",
+        help="File format for per-query analytics reports",
+    )
+    parser.add_argument(
+        "--write-feather",
+        action="store_true",
+        help="Also write processed data as Feather files for fast re-reads",
+    )
 
     args = parser.parse_args()
 
     if args.use_postgre:
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.exc import OperationalError
+
         try:
             logger.info("Starting Docker Compose for PostgreSQL...")
             subprocess.run(["docker-compose", "up", "-d"], check=True)
@@ -274,12 +446,19 @@ def main():
         db_conn_str = f"sqlite:///{args.db_path}"
 
     pipeline = DataPipeline(
-        api_url=args.api_url, db_conn_str=db_conn_str, data_dir=args.data_dir
+        api_url=args.api_url,
+        db_conn_str=db_conn_str,
+        data_dir=args.data_dir,
+        analytics_source=args.analytics_source,
+        report_format=args.report_format,
+        write_feather=args.write_feather,
     )
 
     try:
         if args.stage == "full":
             results = pipeline.run_full_pipeline()
+        elif args.stage == "fused":
+            results = pipeline.run_full_pipeline_fused()
         else:
             results = pipeline.run_single_stage(args.stage)
 
@@ -287,7 +466,7 @@ def main():
         print("PIPELINE EXECUTION RESULTS:")
         print("=" * 50)
 
-        if args.stage == "full" and results.get("success"):
+        if args.stage in ("full", "fused") and results.get("success"):
             print(f"Duration: {results['duration_seconds']:.2f} seconds")
 
             for stage, data in results["stages"].items():
@@ -1,32 +1,176 @@
+import logging
+import orjson
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import json
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from pyarrow import csv as pacsv
 from datetime import datetime
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
 from logger_config import setup_logging
 
 logger = setup_logging(log_file=Path(__file__).parent.parent / "logs" / "pipeline.log")
 
 
+REPORT_FORMATS = ("feather", "parquet", "csv")
+
+
 class DataAnalytics:
     """Class for running analytics queries and generating reports."""
 
     def __init__(
-        self, db_conn_str: str = "sqlite:///local.db", reports_dir: str = "reports"
+        self,
+        db_conn_str: str = "sqlite:///local.db",
+        reports_dir: str = "reports",
+        source: str = "db",
+        data_dir: str = "data",
+        report_format: str = "feather",
     ):
+        if source not in ("db", "parquet"):
+            raise ValueError(f"Unknown analytics source: {source}")
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format: {report_format}")
+
         self.db_conn_str = db_conn_str
+        self.source = source
+        self.report_format = report_format
         self.engine = create_engine(self.db_conn_str)
+        # File-backed SQLite is queried through sqlite3 directly; an
+        # in-memory database only exists behind the SQLAlchemy engine
+        db_path = make_url(self.db_conn_str).database
+        self.sqlite_path = (
+            db_path
+            if self.engine.dialect.name == "sqlite"
+            and db_path not in (None, "", ":memory:")
+            else None
+        )
+        self.processed_dir = Path(__file__).parent.parent / data_dir / "processed"
         self.reports_dir = Path(__file__).parent.parent / reports_dir
         self.reports_dir.mkdir(exist_ok=True)
+        self.con = None
+        self._con_lock = threading.Lock()
+        # Long-lived report workers, each with its own sqlite3 connection
+        # kept across generate_report calls; all tracked for close()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._local = threading.local()
+        self._raw_connections = []
+        self._raw_lock = threading.Lock()
+
+    def get_duckdb_connection(self):
+        """
+        Open an in-memory DuckDB connection with users/posts views
+        over today's processed parquet files.
+        """
+
+        with self._con_lock:
+            if self.con is None:
+                import duckdb
+
+                today_dir = self.processed_dir / datetime.now().strftime("%Y-%m-%d")
+                con = duckdb.connect(":memory:")
+
+                for table_name in ("users", "posts"):
+                    file_path = str(today_dir / f"{table_name}.parquet")
+                    file_path = file_path.replace("'", "''")
+                    con.execute(
+                        f"CREATE VIEW {table_name} AS "
+                        f"SELECT * FROM read_parquet('{file_path}')"
+                    )
+
+                self.con = con
+                logger.info(f"DuckDB views created over parquet files in {today_dir}")
+
+        return self.con
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the report worker pool, creating it on first use."""
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=3, thread_name_prefix="analytics"
+                )
+
+        return self._executor
+
+    def _get_sqlite_connection(self) -> sqlite3.Connection:
+        """Return the calling thread's sqlite3 connection, opening it on first use."""
+
+        raw = getattr(self._local, "raw", None)
+        if raw is None:
+            # check_same_thread=False only so close() can run from another thread
+            raw = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+            self._local.raw = raw
+            with self._raw_lock:
+                self._raw_connections.append(raw)
+
+        return raw
+
+    def _fetch_sqlite(self, query: str) -> pd.DataFrame:
+        """
+        Run a query on the worker thread's long-lived sqlite3 connection,
+        bypassing SQLAlchemy. Workers and their connections outlive a
+        report, so later reports reuse statements already prepared in
+        each connection's statement cache.
+        """
+
+        cursor = self._get_sqlite_connection().execute(query)
+        rows = cursor.fetchall()
+        columns = [d[0] for d in cursor.description]
+
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stop the report workers, close the sqlite3 and DuckDB connections
+        and dispose of the engine.
+        """
+
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+        with self._raw_lock:
+            for raw in self._raw_connections:
+                raw.close()
+            self._raw_connections = []
+            self._local = threading.local()
+
+        with self._con_lock:
+            if self.con is not None:
+                self.con.close()
+                self.con = None
+
+        self.engine.dispose()
 
     def execute_query(self, query: str, query_name: str = "") -> pd.DataFrame:
         """Execute a query and return a dataframe."""
 
         try:
-            with self.engine.connect() as conn:
-                df = pd.read_sql(query, con=conn)
-
-            logger.info(f"Executed query: {query_name}, received {len(df)} rows.")
+            if self.source == "parquet":
+                # A cursor is a separate DuckDB connection, safe to use per thread
+                with self.get_duckdb_connection().cursor() as cursor:
+                    df = cursor.execute(query).fetch_df()
+            elif self.sqlite_path is not None:
+                df = self._fetch_sqlite(query)
+            else:
+                with self.engine.connect() as conn:
+                    df = pd.read_sql(query, con=conn)
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Executed query: {query_name}, received {len(df)} rows.")
             return df
 
         except Exception as e:
@@ -81,11 +225,25 @@ class DataAnalytics:
     def generate_report(self) -> dict:
         """Generate report with three main queries."""
 
+        report, _ = self._generate_report()
+        return report
+
+    def _generate_report(self) -> tuple:
+        """
+        Run the report queries.
+        Returns the JSON-serializable report and the query result
+        DataFrames by name, which the report file writers use directly.
+        """
+
         logger.info("Generating report.")
 
         report = {
             "generated_at": datetime.now().isoformat(),
-            "database": self.db_conn_str,
+            "database": (
+                str(self.processed_dir)
+                if self.source == "parquet"
+                else self.db_conn_str
+            ),
             "analytics": {},
         }
 
@@ -95,11 +253,18 @@ class DataAnalytics:
             ("user_post_activity", self.user_post_activity),
         ]
 
-        for name, func in analytics_functions:
+        # The queries are independent, so they run concurrently,
+        # each worker on its own long-lived connection
+        executor = self._get_executor()
+        futures = {name: executor.submit(func) for name, func in analytics_functions}
+
+        frames = {}
+        for name, future in futures.items():
             try:
-                df = func()
+                df = future.result()
+                frames[name] = df
                 report["analytics"][name] = {
-                    "data": df.to_dict("records"),
+                    "data": df.to_dict(orient="records"),
                     "record_count": len(df),
                     "columns": df.columns.tolist(),
                 }
@@ -112,35 +277,111 @@ class DataAnalytics:
                     "record_count": 0,
                 }
 
-        return report
+        return report, frames
+
+    def _iter_report_tables(self, report: dict, frames: dict = None):
+        """
+        Yield (analysis name, Arrow table) for each non-empty query result,
+        converted from the result DataFrames when given, else from the records.
+        """
 
-    def save_csv_reports(self, report: dict) -> list:
+        for analysis_name, analysis_data in report["analytics"].items():
+            if frames is not None and analysis_name in frames:
+                df = frames[analysis_name]
+                if len(df) > 0:
+                    yield analysis_name, pa.Table.from_pandas(df, preserve_index=False)
+            elif analysis_data.get("data"):
+                yield analysis_name, pa.Table.from_pylist(analysis_data["data"])
+
+    def save_csv_reports(
+        self, report: dict, timestamp: str = None, frames: dict = None
+    ) -> list:
         """Save each query result to separate CSV file."""
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if timestamp is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         saved_files = []
 
-        for analysis_name, analysis_data in report["analytics"].items():
-            if analysis_data.get("data") and len(analysis_data["data"]) > 0:
-                df = pd.DataFrame(analysis_data["data"])
-                filename = f"{analysis_name}_{timestamp}.csv"
-                file_path = self.reports_dir / filename
+        for analysis_name, table in self._iter_report_tables(report, frames):
+            filename = f"{analysis_name}_{timestamp}.csv"
+            file_path = self.reports_dir / filename
 
-                df.to_csv(file_path, index=False, encoding="utf-8")
-                saved_files.append(file_path)
-                logger.info(f"CSV saved: {file_path}")
+            pacsv.write_csv(
+                table,
+                str(file_path),
+                write_options=pacsv.WriteOptions(include_header=True),
+            )
+            saved_files.append(file_path)
+            logger.info(f"CSV saved: {file_path}")
 
         return saved_files
 
-    def save_json_report(self, report: dict) -> Path:
+    def save_parquet_reports(
+        self, report: dict, timestamp: str = None, frames: dict = None
+    ) -> list:
+        """Save each query result to separate Parquet file."""
+
+        if timestamp is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        saved_files = []
+
+        for analysis_name, table in self._iter_report_tables(report, frames):
+            filename = f"{analysis_name}_{timestamp}.parquet"
+            file_path = self.reports_dir / filename
+
+            pq.write_table(table, file_path, compression="zstd")
+            saved_files.append(file_path)
+            logger.info(f"Parquet saved: {file_path}")
+
+        return saved_files
+
+    def save_feather_reports(
+        self, report: dict, timestamp: str = None, frames: dict = None
+    ) -> list:
+        """Save each query result to separate Feather file."""
+
+        if timestamp is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        saved_files = []
+
+        for analysis_name, table in self._iter_report_tables(report, frames):
+            filename = f"{analysis_name}_{timestamp}.feather"
+            file_path = self.reports_dir / filename
+
+            feather.write_feather(table, file_path, compression="zstd")
+            saved_files.append(file_path)
+            logger.info(f"Feather saved: {file_path}")
+
+        return saved_files
+
+    def save_reports(
+        self, report: dict, timestamp: str = None, frames: dict = None
+    ) -> list:
+        """Save each query result in the configured report format."""
+
+        writers = {
+            "feather": self.save_feather_reports,
+            "parquet": self.save_parquet_reports,
+            "csv": self.save_csv_reports,
+        }
+        return writers[self.report_format](report, timestamp, frames)
+
+    def save_json_report(self, report: dict, timestamp: str = None) -> Path:
         """Save summary JSON report."""
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if timestamp is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"summary_report_{timestamp}.json"
         file_path = self.reports_dir / filename
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        with open(file_path, "wb") as f:
+            f.write(
+                orjson.dumps(
+                    report,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                    default=str,
+                )
+            )
 
         logger.info(f"JSON report saved: {file_path}")
         return file_path
@@ -150,21 +391,24 @@ class DataAnalytics:
 
         logger.info("Starting analytics run.")
 
-        report = self.generate_report()
-
-        csv_files = self.save_csv_reports(report)
+        report, frames = self._generate_report()
+        # One timestamp for every file of this run
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        json_file = self.save_json_report(report)
+        report_files = self.save_reports(report, timestamp, frames)
+        json_file = self.save_json_report(report, timestamp)
 
         result = {
             "json_report": str(json_file),
-            "csv_files": [str(f) for f in csv_files],
+            "report_format": self.report_format,
+            "report_files": [str(f) for f in report_files],
             "queries_executed": list(report["analytics"].keys()),
-            "total_csv_files": len(csv_files),
+            "total_report_files": len(report_files),
         }
 
         logger.info(
-            f"Analytics completed. Generated {len(csv_files)} CSV files and 1 JSON report."
+            f"Analytics completed. Generated {len(report_files)} "
+            f"{self.report_format.upper()} files and 1 JSON report."
         )
         return result
 
@@ -172,13 +416,12 @@ class DataAnalytics:
 def main():
     """Example usage of DataAnalytics"""
 
-    analytics = DataAnalytics()
-
     try:
-        results = analytics.run_analytics()
+        with DataAnalytics() as analytics:
+            results = analytics.run_analytics()
         print(f"Reports generated:")
         print(f"JSON report: {results['json_report']}")
-        print(f"CSV files: {results['csv_files']}")
+        print(f"Report files: {results['report_files']}")
 
     except Exception as e:
         logger.error(f"Error running analytics: {e}")
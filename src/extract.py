@@ -1,5 +1,10 @@
-import json
+import asyncio
+import aiofiles
+import aiohttp
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from pathlib import Path
 from logger_config import setup_logging
@@ -14,15 +19,41 @@ class DataExtractor:
         self.base_url = base_url
         self.data_dir = Path(__file__).parent.parent / data_dir
         self.raw_dir = self.data_dir / "raw"
+        self._raw_today_dir = None
+
+        # One pooled session keeps connections alive between requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the underlying HTTP session"""
+
+        self.session.close()
 
     def create_directories(self) -> Path:
-        """Create necessary directories based on today's date"""
+        """
+        Create necessary directories based on today's date.
+        The date is fixed on first call for the lifetime of the extractor.
+        """
 
-        today = datetime.now().strftime("%Y-%m-%d")
-        raw_today_dir = self.raw_dir / today
-        raw_today_dir.mkdir(parents=True, exist_ok=True)
+        if self._raw_today_dir is None:
+            today = datetime.now().strftime("%Y-%m-%d")
+            self._raw_today_dir = self.raw_dir / today
+            self._raw_today_dir.mkdir(parents=True, exist_ok=True)
 
-        return raw_today_dir
+        return self._raw_today_dir
 
     def fetch_data(self, endpoint: str, params: dict = None) -> dict:
         """Fetch data from REST API"""
@@ -31,7 +62,7 @@ class DataExtractor:
 
         try:
             logger.info(f"Fetching data from {url}")
-            response = requests.get(url, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
 
             logger.info(f"Successfully fetched data from {url}")
@@ -41,6 +72,28 @@ class DataExtractor:
             logger.error(f"Failed to fetch data from {url}: {e}")
             raise e
 
+    async def fetch_data_async(
+        self, session: aiohttp.ClientSession, endpoint: str, params: dict = None
+    ) -> dict:
+        """Fetch data from REST API using a shared aiohttp session"""
+
+        url = f"{self.base_url.rstrip('/')}{endpoint}"
+
+        try:
+            logger.info(f"Fetching data from {url}")
+            async with session.get(
+                url, params=params, timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+
+            logger.info(f"Successfully fetched data from {url}")
+            return data
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to fetch data from {url}: {e}")
+            raise e
+
     def save_raw_data(self, data: dict, filename: str = "response.json") -> Path:
         """Save raw data to file"""
 
@@ -48,8 +101,27 @@ class DataExtractor:
         file_path = raw_dir / filename
 
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(file_path, "wb") as f:
+                f.write(orjson.dumps(data))
+
+            logger.info(f"Saved raw data to {file_path}")
+            return file_path
+
+        except Exception as e:
+            logger.error(f"Failed to save raw data to {file_path}: {e}")
+            raise e
+
+    async def save_raw_data_async(
+        self, data: dict, filename: str = "response.json"
+    ) -> Path:
+        """Save raw data to file without blocking the event loop"""
+
+        raw_dir = self.create_directories()
+        file_path = raw_dir / filename
+
+        try:
+            async with aiofiles.open(file_path, "wb") as f:
+                await f.write(orjson.dumps(data))
 
             logger.info(f"Saved raw data to {file_path}")
             return file_path
@@ -69,13 +141,56 @@ class DataExtractor:
         logger.info(f"Extracted data to {filename} from {endpoint}")
         return data
 
+    async def extract_and_save_async(
+        self,
+        session: aiohttp.ClientSession,
+        endpoint: str,
+        filename: str,
+        params: dict = None,
+    ) -> dict:
+        """Full cycle for one endpoint: fetch and save data asynchronously"""
+
+        data = await self.fetch_data_async(session, endpoint, params)
+        await self.save_raw_data_async(data, filename)
+
+        logger.info(f"Extracted data to {filename} from {endpoint}")
+        return data
+
+    async def fetch_all(self, endpoints: list) -> list:
+        """
+        Fetch several endpoints concurrently without saving them.
+        Returns the fetched data in the same order as endpoints.
+        """
+
+        connector = aiohttp.TCPConnector(limit=16)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(
+                *[self.fetch_data_async(session, endpoint) for endpoint in endpoints]
+            )
+
+    async def extract_all(self, endpoints: list) -> list:
+        """
+        Fetch and save several endpoints concurrently.
+        Takes a list of (endpoint, filename) pairs and returns
+        the fetched data in the same order.
+        """
+
+        connector = aiohttp.TCPConnector(limit=16)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(
+                *[
+                    self.extract_and_save_async(session, endpoint, filename)
+                    for endpoint, filename in endpoints
+                ]
+            )
+
 
 def main():
     """Example usage of the module"""
-    extractor = DataExtractor(base_url="https://jsonplaceholder.typicode.com")
-
-    users_data = extractor.extract_and_save("/users", filename="users.json")
-    posts_data = extractor.extract_and_save("/posts", filename="posts.json")
+    with DataExtractor(base_url="https://jsonplaceholder.typicode.com") as extractor:
+        users_data, posts_data = asyncio.run(
+            extractor.extract_all([("/users", "users.json"), ("/posts", "posts.json")])
+        )
 
 
 if __name__ == "__main__":
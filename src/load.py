@@ -1,11 +1,12 @@
+import logging
 import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from sqlalchemy import text
 from sqlalchemy import (
     create_engine,
     MetaData,
-    Table,
     Column,
     Integer,
     String,
@@ -14,10 +15,12 @@ from sqlalchemy import (
     DateTime,
     Text,
 )
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import declarative_base, sessionmaker
+import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 from logger_config import setup_logging
+from schemas import PROCESSED_SCHEMAS
 
 logger = setup_logging(log_file=Path(__file__).parent.parent / "logs" / "pipeline.log")
 
@@ -42,6 +45,69 @@ LENGTH_RULES = {
 }
 
 
+# Column positions to clean in each processed schema, resolved once at import
+# so cleaning a batch needs no per-column name lookup or dtype check
+CLEAN_PLAN = {
+    table_type: {
+        "created_at": schema.get_field_index("created_at"),
+        "truncate": [
+            (schema.get_field_index(col), max_len)
+            for col, max_len in LENGTH_RULES[table_type].items()
+        ],
+    }
+    for table_type, schema in PROCESSED_SCHEMAS.items()
+}
+
+# Relaxed for the load window only, then restored to their previous values.
+# journal_mode is not toggled: WAL is set once on the database file, and
+# leaving WAL fails while any other connection has the file open
+SQLITE_FAST_LOAD_PRAGMAS = {
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": "-200000",
+}
+
+
+def _parse_timestamps_arrow(arr: pa.Array) -> pa.Array:
+    """
+    Parse ISO-8601 strings with Arrow's cast kernel,
+    falling back to pandas for values it cannot parse.
+    """
+    try:
+        return pc.cast(arr, pa.timestamp("us"))
+    except pa.ArrowInvalid:
+        parsed = pd.to_datetime(arr.to_pandas(), errors="coerce")
+        return pa.array(parsed, type=pa.timestamp("us"))
+
+
+def _parse_timestamps(series: pd.Series) -> pd.Series:
+    """Parse a created_at column into timestamps"""
+
+    if not pd.api.types.is_string_dtype(series):
+        return pd.to_datetime(series, errors="coerce")
+
+    parsed = _parse_timestamps_arrow(pa.array(series, type=pa.string()))
+    return pd.Series(
+        pd.array(parsed, dtype=pd.ArrowDtype(pa.timestamp("us"))), index=series.index
+    )
+
+
+def _iter_db_rows(batch: pa.RecordBatch):
+    """Iterate batch rows as tuples of plain Python values for the DB driver"""
+
+    columns = []
+    for arr in batch.columns:
+        if pa.types.is_timestamp(arr.type):
+            # Same text layout SQLAlchemy uses for DateTime columns on SQLite
+            arr = pc.strftime(
+                pc.cast(arr, pa.timestamp("us"), safe=False),
+                format="%Y-%m-%d %H:%M:%S",
+            )
+        columns.append(arr.to_pylist())
+
+    return zip(*columns)
+
+
 class User(Base):
     """User table model"""
 
@@ -70,7 +136,7 @@ class Post(Base):
     __tablename__ = "posts"
 
     post_id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False, index=True)
     title = Column(String(500), nullable=False)
     body = Column(Text, nullable=False)
     title_length = Column(Integer)
@@ -87,16 +153,73 @@ class DatabaseLoader:
         self.db_conn_str = db_conn_str
         self.data_dir = Path(__file__).parent.parent / data_dir
         self.processed_dir = self.data_dir / "processed"
-        self.engine = create_engine(self.db_conn_str)
+        self.is_sqlite = self.db_conn_str.startswith("sqlite")
+        # Let the sqlite3 driver run in autocommit mode so that
+        # transactions are controlled by explicit BEGIN/COMMIT only
+        connect_args = {"isolation_level": None} if self.is_sqlite else {}
+        self.engine = create_engine(self.db_conn_str, connect_args=connect_args)
         self.Session = sessionmaker(bind=self.engine)
+        # Row counts of tables fully replaced by this loader, kept after commit
+        self.row_counts = {}
 
     def create_tables(self):
         """Create all tables in database"""
 
         logger.info("Creating tables...")
         Base.metadata.create_all(self.engine)
+
+        if self.is_sqlite:
+            # WAL is persistent in the database file, so this is a no-op
+            # once set and never needs to be switched back per load
+            with self.engine.connect() as conn:
+                conn.exec_driver_sql("PRAGMA journal_mode=WAL")
         logger.info("Tables created successfully")
 
+    def create_indexes(self):
+        """
+        Make sure lookup indexes exist on loaded tables
+        and refresh planner statistics
+        """
+
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS ix_posts_user_id ON posts (user_id)"
+            )
+            conn.exec_driver_sql("ANALYZE")
+
+        logger.info("Indexes created and statistics updated")
+
+    @contextmanager
+    def _fast_load_context(self):
+        """
+        Open one connection with a single transaction for a bulk load.
+        On SQLite, fsync-heavy PRAGMAs are relaxed for the load window
+        and restored to their previous values after commit.
+        """
+        if not self.is_sqlite:
+            with self.engine.begin() as conn:
+                yield conn
+            return
+
+        with self.engine.connect() as conn:
+            previous = {
+                name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in SQLITE_FAST_LOAD_PRAGMAS
+            }
+            for name, value in SQLITE_FAST_LOAD_PRAGMAS.items():
+                conn.exec_driver_sql(f"PRAGMA {name}={value}")
+            conn.exec_driver_sql("BEGIN")
+
+            try:
+                yield conn
+                conn.exec_driver_sql("COMMIT")
+            except Exception:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+            finally:
+                for name, value in previous.items():
+                    conn.exec_driver_sql(f"PRAGMA {name}={value}")
+
     def load_processed_data(self, filename: str, date: str = None) -> pd.DataFrame:
         """Load processed data"""
 
@@ -109,51 +232,183 @@ class DatabaseLoader:
             raise FileNotFoundError(f"File not found: {file_path}")
 
         table = pq.read_table(file_path)
-        df = table.to_pandas()
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
 
         logger.info(f"Loaded {len(df)} records from: {file_path}")
         return df
 
+    def _target_columns(self, table_name: str, names: list) -> list:
+        """Keep only the columns defined for the target table"""
+
+        table_columns = Base.metadata.tables[table_name].columns.keys()
+        return [name for name in names if name in table_columns]
+
+    def iter_processed_batches(
+        self, filename: str, date: str = None, batch_size: int = 10_000
+    ):
+        """
+        Stream processed parquet data as Arrow record batches,
+        reading only the columns present in the target table.
+        """
+
+        if date is None:
+            date = datetime.now().strftime("%Y-%m-%d")
+
+        file_path = self.processed_dir / date / filename
+
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        parquet_file = pq.ParquetFile(file_path)
+        columns = self._target_columns(
+            Path(filename).stem, parquet_file.schema_arrow.names
+        )
+
+        logger.info(
+            f"Streaming {parquet_file.metadata.num_rows} records from: {file_path}"
+        )
+        return parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+
     def clean_dataframe_for_db(self, df: pd.DataFrame, table_type: str) -> pd.DataFrame:
         """
         Prepare DataFrame for database insertion:
         - enforce string length limits according to schema
         - convert created_at to datetime if exists
         """
-        df_clean = df.copy()
+        # Shallow copy: columns are reassigned, never modified in place,
+        # so the caller's frame stays untouched without duplicating buffers
+        df_clean = df.copy(deep=False)
 
         if "created_at" in df_clean.columns:
-            df_clean["created_at"] = pd.to_datetime(
-                df_clean["created_at"], errors="coerce"
-            )
+            df_clean["created_at"] = _parse_timestamps(df_clean["created_at"])
 
         if table_type in LENGTH_RULES:
             for col, max_len in LENGTH_RULES[table_type].items():
                 if col in df_clean.columns and pd.api.types.is_string_dtype(
                     df_clean[col]
                 ):
-                    df_clean[col] = df_clean[col].astype(str).str[:max_len]
+                    arr = pa.array(df_clean[col], type=pa.string())
+                    df_clean[col] = pd.array(
+                        pc.utf8_slice_codeunits(arr, 0, max_len),
+                        dtype=pd.ArrowDtype(pa.string()),
+                    )
 
         logger.info(f"Cleaned {table_type} dataframe")
         return df_clean
 
-    def load_to_database(
-        self, df: pd.DataFrame, table_name: str, if_exists: str = "replace"
+    def clean_batch_for_db(
+        self, batch: pa.RecordBatch, table_type: str
+    ) -> pa.RecordBatch:
+        """
+        Arrow version of clean_dataframe_for_db for streamed record batches:
+        - enforce string length limits according to schema
+        - convert created_at to timestamp
+        Columns are addressed by position in the processed schema.
+        """
+        schema = PROCESSED_SCHEMAS[table_type]
+        plan = CLEAN_PLAN[table_type]
+
+        if batch.schema.names != schema.names:
+            batch = batch.select(schema.names)
+
+        for i, max_len in plan["truncate"]:
+            batch = batch.set_column(
+                i,
+                batch.schema.field(i),
+                pc.utf8_slice_codeunits(batch.column(i), 0, max_len),
+            )
+
+        i = plan["created_at"]
+        batch = batch.set_column(
+            i,
+            pa.field("created_at", pa.timestamp("us")),
+            _parse_timestamps_arrow(batch.column(i)),
+        )
+
+        return batch
+
+    def _insert_batch_sqlite(
+        self, batch: pa.RecordBatch, table_name: str, conn
     ) -> None:
         """
-        Load DataFrame into database table.
+        Insert batch rows with a single executemany call
+        on the raw sqlite3 cursor, bypassing the SQLAlchemy/pandas
+        per-row parameter handling.
         """
+        columns = ", ".join(batch.schema.names)
+        placeholders = ", ".join("?" * batch.num_columns)
+        query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+
+        cursor = conn.connection.cursor()
         try:
-            df.to_sql(table_name, self.engine, if_exists=if_exists, index=False)
-            logger.info(f"Inserted {len(df)} rows into table {table_name}")
+            cursor.executemany(query, _iter_db_rows(batch))
+        finally:
+            cursor.close()
+
+    def load_batches_to_database(
+        self, batches, table_name: str, conn, if_exists: str = "replace"
+    ) -> int:
+        """
+        Load a stream of record batches into an existing database table
+        inside the given connection's transaction. Returns inserted row count.
+        """
+        try:
+            if if_exists == "replace":
+                conn.exec_driver_sql(f"DELETE FROM {table_name}")
+
+            count = 0
+            for batch in batches:
+                if self.is_sqlite:
+                    self._insert_batch_sqlite(batch, table_name, conn)
+                else:
+                    batch.to_pandas(types_mapper=pd.ArrowDtype).to_sql(
+                        table_name,
+                        conn,
+                        if_exists="append",
+                        index=False,
+                        method="multi",
+                        chunksize=1000,
+                    )
+                count += batch.num_rows
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Inserted {count} rows into table {table_name}")
+            return count
 
         except Exception as e:
             logger.error(f"Failed to insert {table_name}: {e}")
             raise e
 
+    def load_to_database(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        if_exists: str = "replace",
+        conn=None,
+    ) -> int:
+        """
+        Load DataFrame into an existing database table.
+        With if_exists="replace" the old rows are deleted in the same
+        transaction, so the table schema is kept. Pass conn to reuse
+        an already open transaction. Returns inserted row count.
+        """
+        if conn is None:
+            with self._fast_load_context() as conn:
+                count = self.load_to_database(df, table_name, if_exists, conn)
+
+            if if_exists == "replace":
+                self.row_counts[table_name] = count
+            else:
+                self.row_counts.pop(table_name, None)
+            return count
+
+        batch = pa.RecordBatch.from_pandas(df, preserve_index=False)
+        return self.load_batches_to_database([batch], table_name, conn, if_exists)
+
     def verify_data_load(self, table_name: str) -> dict:
         """
-        Verify number of rows in a table.
+        Verify number of rows in a table with a COUNT(*) query.
+        Not used on the load path, where counts come from the inserts.
         """
         query = text(f"SELECT COUNT(*) as count FROM {table_name}")
         with self.engine.connect() as conn:
@@ -166,44 +421,74 @@ class DatabaseLoader:
     def get_table_info(self) -> dict:
         """
         Get info about all tables in database.
+        Tables loaded by this loader report their cached row count,
+        others are counted.
         """
         metadata = MetaData()
         metadata.reflect(bind=self.engine)
 
         table_info = {}
         for table_name in metadata.tables.keys():
-            stats = self.verify_data_load(table_name)
+            if table_name in self.row_counts:
+                stats = {"table": table_name, "count": self.row_counts[table_name]}
+            else:
+                stats = self.verify_data_load(table_name)
             table_info[table_name] = stats
 
         return table_info
 
-    def load_all_data(self, date: str = None) -> dict:
+    def load_all_data(self, date: str = None, tables: dict = None) -> dict:
         """
         Load all processed parquet data into DB.
+        If tables ({"users": pa.Table, "posts": pa.Table}) are given,
+        they are loaded directly and the parquet files are not read.
         """
         results = {}
+        sources = {}
 
         self.create_tables()
 
+        for table_name in ("users", "posts"):
+            try:
+                if tables and table_name in tables:
+                    table = tables[table_name]
+                    table = table.select(
+                        self._target_columns(table_name, table.schema.names)
+                    )
+                    sources[table_name] = table.to_batches(max_chunksize=10_000)
+                    continue
+
+                sources[table_name] = self.iter_processed_batches(
+                    f"{table_name}.parquet", date
+                )
+
+            except Exception as e:
+                logger.warning(f"{table_name.capitalize()} file not found: {e}")
+                results[table_name] = {"table": table_name, "count": 0, "error": str(e)}
+
+        # Both tables are written in one transaction so they commit together
+        counts = {}
         try:
-            users_df = self.load_processed_data("users.parquet", date)
-            users_df_clean = self.clean_dataframe_for_db(users_df, "users")
-            self.load_to_database(users_df_clean, "users")
-            results["users"] = self.verify_data_load("users")
+            with self._fast_load_context() as conn:
+                for table_name, batches in sources.items():
+                    clean_batches = (
+                        self.clean_batch_for_db(batch, table_name) for batch in batches
+                    )
+                    counts[table_name] = self.load_batches_to_database(
+                        clean_batches, table_name, conn
+                    )
 
         except Exception as e:
-            logger.warning(f"Users file not found: {e}")
-            results["users"] = {"table": "users", "count": 0, "error": str(e)}
+            for table_name in sources:
+                results[table_name] = {"table": table_name, "count": 0, "error": str(e)}
+            return results
 
-        try:
-            posts_df = self.load_processed_data("posts.parquet", date)
-            posts_df_clean = self.clean_dataframe_for_db(posts_df, "posts")
-            self.load_to_database(posts_df_clean, "posts")
-            results["posts"] = self.verify_data_load("posts")
+        if "posts" in sources:
+            self.create_indexes()
 
-        except Exception as e:
-            logger.warning(f"Posts file not found: {e}")
-            results["posts"] = {"table": "posts", "count": 0, "error": str(e)}
+        self.row_counts.update(counts)
+        for table_name, count in counts.items():
+            results[table_name] = {"table": table_name, "count": count}
 
         logger.info(f"All tables loaded")
         return results
@@ -215,7 +500,8 @@ class DatabaseLoader:
         try:
             with self.engine.connect() as conn:
                 df = pd.read_sql(query, conn)
-            logger.info(f"Query executed, got {len(df)} rows")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Query executed, got {len(df)} rows")
             return df
 
         except Exception as e:
@@ -2,10 +2,19 @@ import logging
 import sys
 from pathlib import Path
 
+_configured = False
+
 
 def setup_logging(
     log_file: str = "pipeline.log", log_level: int = logging.INFO
 ) -> logging.Logger:
+    global _configured
+
+    logger = logging.getLogger(__name__)
+
+    # Handlers are installed once per process; later calls reuse them
+    if _configured:
+        return logger
 
     for handler in logging.root.handlers[:]:
         logging.root.removeHandler(handler)
@@ -31,7 +40,7 @@ def setup_logging(
     root_logger.addHandler(file_handler)
     root_logger.addHandler(console_handler)
 
-    logger = logging.getLogger(__name__)
+    _configured = True
     logger.info("Logging system initialized successfully")
 
     return logger
@@ -0,0 +1,40 @@
+import pyarrow as pa
+
+# Arrow schemas of the processed users/posts data,
+# as written to parquet by the transform stage
+
+USERS_SCHEMA = pa.schema(
+    [
+        ("user_id", pa.int64()),
+        ("username", pa.string()),
+        ("name", pa.string()),
+        ("email", pa.string()),
+        ("phone", pa.string()),
+        ("website", pa.string()),
+        ("city", pa.string()),
+        ("zipcode", pa.string()),
+        ("lat", pa.float64()),
+        ("lng", pa.float64()),
+        ("company_name", pa.string()),
+        ("company_catchphrase", pa.string()),
+        ("email_domain", pa.string()),
+        ("has_coordinates", pa.bool_()),
+        ("created_at", pa.string()),
+    ]
+)
+
+POSTS_SCHEMA = pa.schema(
+    [
+        ("post_id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("title", pa.string()),
+        ("body", pa.string()),
+        ("title_length", pa.int64()),
+        ("body_length", pa.int64()),
+        ("word_count", pa.int64()),
+        ("created_at", pa.string()),
+        ("post_category", pa.string()),
+    ]
+)
+
+PROCESSED_SCHEMAS = {"users": USERS_SCHEMA, "posts": POSTS_SCHEMA}